@@ -2,21 +2,33 @@
 API Dependencies — аутентификация и общие зависимости.
 """
 
-import json
+import asyncio
+import hashlib
 import logging
 from typing import AsyncGenerator
 
-from fastapi import Depends, HTTPException, status
-from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+import orjson
+from fastapi import Depends, Header, HTTPException, status
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from common.auth.telegram import TelegramAuth
 from common.db.postgres.base import get_session
 from common.db.postgres.uow import UnitOfWork
+from common.redis import redis_client
 from config import config
 
 logger = logging.getLogger(__name__)
-bearer_scheme = HTTPBearer()
+
+# OpenAPI: Bearer схема для эндпоинтов с get_current_user (openapi_extra=BEARER_AUTH_OPENAPI).
+# Сама схема "BearerAuth" регистрируется в api/main.py
+BEARER_AUTH_OPENAPI = {"security": [{"BearerAuth": []}]}
+
+# Время жизни кэша проверенного init_data (секунды)
+AUTH_CACHE_TTL = 300
+
+# Фоновые задачи обновления профиля (держим ссылки, чтобы их не собрал GC)
+_background_tasks: set[asyncio.Task] = set()
 
 
 async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
@@ -26,17 +38,26 @@ async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
 
 
 async def get_uow(session: AsyncSession = Depends(get_db_session)) -> UnitOfWork:
-    """Dependency для получения Unit of Work."""
+    """
+    Dependency для получения Unit of Work.
+
+    FastAPI кэширует результат в рамках запроса: get_current_user и эндпоинт
+    получают один и тот же UnitOfWork (и одну сессию). Поэтому в эндпоинтах
+    используй только Depends(get_uow) — без use_cache=False и без прямого
+    Depends(get_db_session), иначе на запрос откроется вторая сессия.
+    """
     return UnitOfWork(session)
 
 
 async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    authorization: str | None = Header(default=None, include_in_schema=False),
     uow: UnitOfWork = Depends(get_uow),
 ) -> int:
     """
     Валидация Telegram WebApp init_data из Bearer токена.
 
+    Заголовок Authorization читается напрямую, без HTTPBearer.
+
     Returns:
         user_id: ID пользователя в БД
 
@@ -44,9 +65,9 @@ async def get_current_user(
         HTTPException 401: Невалидный токен
         HTTPException 500: Ошибка создания пользователя
     """
-    token = credentials.credentials
+    scheme, _, token = (authorization or "").partition(" ")
 
-    if not token:
+    if scheme.lower() != "bearer" or not token:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Not authenticated",
@@ -59,6 +80,31 @@ async def get_current_user(
         if parts[0] == config.api.debug_token and len(parts) == 2:
             return int(parts[1])
 
+    return await _verify_and_resolve(token, uow)
+
+
+def _auth_cache_key(token: str) -> str:
+    """Ключ кэша аутентификации: хэш от init_data, сам токен в Redis не храним."""
+    return "auth:" + hashlib.blake2b(token.encode(), digest_size=16).hexdigest()
+
+
+async def _verify_and_resolve(token: str, uow: UnitOfWork) -> int:
+    """
+    Проверка init_data и получение ID пользователя в БД.
+
+    Результат кэшируется в Redis на AUTH_CACHE_TTL секунд (но не дольше срока
+    действия init_data), поэтому повторные запросы с тем же токеном пропускают
+    проверку подписи и запрос к БД.
+    """
+    cache_key = _auth_cache_key(token)
+
+    try:
+        cached_user_id = await redis_client.get(cache_key)
+        if cached_user_id:
+            return int(cached_user_id)
+    except Exception:
+        pass
+
     # Парсим init_data
     try:
         parsed_data = TelegramAuth.parse_init_data(token)
@@ -90,17 +136,19 @@ async def get_current_user(
         )
 
     # Проверяем срок действия
+    cache_ttl = AUTH_CACHE_TTL
     if "auth_date" in parsed_data:
         if not TelegramAuth.check_expiration(parsed_data["auth_date"]):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Init data expired",
             )
+        cache_ttl = min(cache_ttl, TelegramAuth.remaining_ttl(parsed_data["auth_date"]))
 
     # Парсим данные пользователя
     try:
-        user_data = json.loads(parsed_data["user"])
-    except json.JSONDecodeError:
+        user_data = orjson.loads(parsed_data["user"])
+    except orjson.JSONDecodeError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid user data format",
@@ -113,18 +161,59 @@ async def get_current_user(
             detail="Missing user ID",
         )
 
-    # Создаём/получаем пользователя в БД
+    # Только пришедшие поля: None = данных нет, существующее значение не затираем
+    # (то же правило, что в profile_changed и get_or_create)
+    profile = {
+        key: user_data[key]
+        for key in ("username", "first_name", "last_name")
+        if user_data.get(key) is not None
+    }
+
+    # Получаем пользователя (SELECT, кэшируется), создаём только при первом входе:
+    # get_or_create атомарен, параллельные первые запросы не падают на unique индексе.
+    # Изменения профиля записываются в фоне, не задерживая ответ
+    created = False
     try:
-        user, _ = await uow.users.get_or_create(
-            telegram_id=telegram_id,
-            username=user_data.get("username"),
-            first_name=user_data.get("first_name"),
-            last_name=user_data.get("last_name"),
-        )
-        return user.id
-    except Exception as e:
-        logger.exception(f"Failed to create user: telegram_id={telegram_id}, error={e}")
+        user = await uow.users.get_by_telegram_id(telegram_id)
+        if user is None:
+            user, created = await uow.users.get_or_create(telegram_id=telegram_id, **profile)
+        elif uow.users.profile_changed(user, **profile):
+            _schedule_profile_update(user.id, profile)
+    except SQLAlchemyError:
+        logger.exception("Failed to create user: telegram_id=%s", telegram_id)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal error",
         )
+
+    # Только что созданный пользователь ещё не закоммичен: если запрос упадёт,
+    # INSERT откатится, а кэш указывал бы на несуществующий id. Кэшируем со следующего запроса
+    if cache_ttl > 0 and not created:
+        try:
+            await redis_client.set(cache_key, str(user.id), ex=cache_ttl)
+        except Exception:
+            pass
+
+    return user.id
+
+
+def _schedule_profile_update(user_id: int, profile: dict) -> None:
+    """Запустить обновление профиля в фоне (в отдельной сессии)."""
+    task = asyncio.create_task(_update_profile(user_id, profile))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def drain_background_tasks() -> None:
+    """Дождаться фоновых задач (вызывается в lifespan до закрытия Redis/БД)."""
+    await asyncio.gather(*_background_tasks, return_exceptions=True)
+
+
+async def _update_profile(user_id: int, profile: dict) -> None:
+    """Обновить профиль пользователя в собственной сессии."""
+    try:
+        async with get_session() as session:
+            await UnitOfWork(session).users.update(user_id, **profile)
+    except Exception:
+        # Задачу никто не ожидает — логируем любую ошибку, иначе она потеряется
+        logger.exception("Failed to update user profile: user_id=%s", user_id)
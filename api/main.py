@@ -5,12 +5,14 @@
     uv run uvicorn api.main:app --reload
 """
 
+import time
 from contextlib import asynccontextmanager
 from datetime import datetime
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from api.dependencies import drain_background_tasks
 from api.routes import users
 from common.redis import redis_client
 from config import config
@@ -32,6 +34,8 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     print("API shutting down...")
+    # Дожидаемся фоновых обновлений профиля, пока Redis и БД ещё доступны
+    await drain_background_tasks()
     await redis_client.disconnect()
 
 
@@ -55,19 +59,48 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
-# CORS
+# CORS: авторизация через Bearer заголовок, cookies не нужны (allow_credentials=False).
+# max_age — браузер кэширует preflight и не шлёт OPTIONS перед каждым запросом
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_origins=config.api.allowed_origins,
+    allow_credentials=False,
+    allow_methods=["GET", "POST"],
+    allow_headers=["Authorization", "Content-Type", "If-None-Match"],
+    expose_headers=["ETag"],
+    max_age=86400,
 )
 
 # Роутеры
 app.include_router(users.router)
 
 
+def custom_openapi() -> dict:
+    """OpenAPI схема с Bearer авторизацией (токен читается вручную в get_current_user)."""
+    if app.openapi_schema:
+        return app.openapi_schema
+
+    # Стандартная генерация (description, servers, tags и т.д. из FastAPI(...)) + схема Bearer
+    schema = FastAPI.openapi(app)
+    schema.setdefault("components", {}).setdefault("securitySchemes", {})["BearerAuth"] = {
+        "type": "http",
+        "scheme": "bearer",
+    }
+    return schema
+
+
+app.openapi = custom_openapi
+
+
+# Ответ /health пересобирается не чаще раза в секунду (частые liveness-пробы)
+_health_response: tuple[int, dict] = (0, {})
+
+
 @app.get("/health")
 async def health_check():
-    return {"status": "ok", "timestamp": datetime.now().isoformat()}
+    global _health_response
+
+    now = int(time.time())
+    if _health_response[0] != now:
+        _health_response = (now, {"status": "ok", "timestamp": datetime.fromtimestamp(now).isoformat()})
+    return _health_response[1]
@@ -2,22 +2,53 @@
 Эндпоинты для работы с пользователями.
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+import hashlib
 
-from api.dependencies import get_current_user, get_uow
+import orjson
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+
+from api.dependencies import BEARER_AUTH_OPENAPI, get_current_user, get_uow
 from api.schemas import UserResponse
 from common.db.postgres.uow import UnitOfWork
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
+# Поля ответа /me: ORM объект сериализуется напрямую через orjson, без model_validate
+_USER_RESPONSE_FIELDS = tuple(UserResponse.model_fields)
+
+
+def _etag(body: bytes) -> str:
+    """Strong ETag по содержимому ответа."""
+    return '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Проверка заголовка If-None-Match (список ETag через запятую или *)."""
+    if not if_none_match:
+        return False
+    return any(tag.strip() in (etag, "*", "W/" + etag) for tag in if_none_match.split(","))
 
-@router.get("/me", response_model=UserResponse)
+
+@router.get("/me", response_model=UserResponse, openapi_extra=BEARER_AUTH_OPENAPI)
 async def get_me(
     user_id: int = Depends(get_current_user),
     uow: UnitOfWork = Depends(get_uow),
+    if_none_match: str | None = Header(default=None),
 ):
-    """Получить данные текущего пользователя."""
+    """
+    Получить данные текущего пользователя.
+
+    Пользователь берётся через кэшируемый get_by_id (Redis, инвалидация при
+    изменении). Ответ отдаётся с ETag — на повторный запрос с совпадающим
+    If-None-Match возвращается 304 без тела.
+    """
     user = await uow.users.get_by_id(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    return UserResponse.model_validate(user)
+
+    body = orjson.dumps({field: getattr(user, field) for field in _USER_RESPONSE_FIELDS})
+    headers = {"ETag": _etag(body), "Cache-Control": "private, no-cache"}
+
+    if _etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -5,15 +5,40 @@
 https://core.telegram.org/bots/webapps#validating-data-received-via-the-mini-app
 """
 
-import hashlib
+import functools
 import hmac
-import json
-from datetime import datetime, timezone
+import time
 from typing import Any
-from urllib.parse import parse_qsl
+from urllib.parse import unquote_plus
+
+import orjson
 
 from config import config
 
+# Поля init_data в порядке сортировки (data check string требует sorted по ключу)
+_INIT_DATA_KEYS = (
+    "auth_date",
+    "can_send_after",
+    "chat",
+    "chat_instance",
+    "chat_type",
+    "query_id",
+    "receiver",
+    "signature",
+    "start_param",
+    "user",
+)
+_INIT_DATA_KEYS_SET = frozenset(_INIT_DATA_KEYS)
+
+
+@functools.lru_cache(maxsize=1)
+def _get_secret_key(bot_token: str) -> bytes:
+    """Secret key для проверки подписи: HMAC-SHA256("WebAppData", bot_token)."""
+    if not bot_token:
+        raise ValueError("bot_token not configured")
+
+    return hmac.digest(b"WebAppData", bot_token.encode(), "sha256")
+
 
 class TelegramAuth:
     """Helper для валидации Telegram WebApp authentication data."""
@@ -36,43 +61,50 @@ class TelegramAuth:
         Returns:
             True если подпись валидна
         """
-        bot_token = config.bot.token
-        if not bot_token:
-            raise ValueError("bot_token not configured")
-
-        # Step 1: Create secret key
-        secret_key = hmac.new(
-            key=b"WebAppData",
-            msg=bot_token.encode(),
-            digestmod=hashlib.sha256,
-        ).digest()
+        # Step 1: Secret key (вычисляется один раз на токен)
+        secret_key = _get_secret_key(config.bot.token)
 
         # Step 2: Create data check string
-        data_check_string = "\n".join(
-            f"{k}={v}" for k, v in sorted(data.items())
-        )
+        # Для известных полей порядок задан заранее, sorted() — только если пришло что-то новое
+        if data.keys() <= _INIT_DATA_KEYS_SET:
+            keys = _INIT_DATA_KEYS
+        else:
+            keys = sorted(data)
+        data_check_string = "\n".join(f"{k}={data[k]}" for k in keys if k in data).encode()
 
         # Step 3: Compute hash
-        computed_hash = hmac.new(
-            key=secret_key,
-            msg=data_check_string.encode(),
-            digestmod=hashlib.sha256,
-        ).hexdigest()
+        # hmac.digest() — one-shot через OpenSSL, без создания объекта HMAC
+        computed_hash = hmac.digest(secret_key, data_check_string, "sha256").hex()
 
         # Step 4: Compare (constant-time)
         return hmac.compare_digest(computed_hash, received_hash)
 
     @staticmethod
     def parse_init_data(init_data: str) -> dict[str, Any]:
-        """Парсинг raw init_data string в словарь."""
-        return dict(parse_qsl(init_data))
+        """
+        Парсинг raw init_data string в словарь.
+
+        Эквивалент dict(parse_qsl(init_data)), но percent-decoding выполняется
+        только для ключей и значений, где он нужен (на практике — user/chat JSON).
+        """
+        data = {}
+        for pair in init_data.split("&"):
+            key, _, value = pair.partition("=")
+            if not value:
+                continue
+            if "%" in key or "+" in key:
+                key = unquote_plus(key)
+            if "%" in value or "+" in value:
+                value = unquote_plus(value)
+            data[key] = value
+        return data
 
     @staticmethod
     def extract_user_data(user_json: str) -> dict[str, Any] | None:
         """Извлечение данных пользователя из JSON строки."""
         try:
-            return json.loads(user_json)
-        except json.JSONDecodeError:
+            return orjson.loads(user_json)
+        except orjson.JSONDecodeError:
             return None
 
     @staticmethod
@@ -88,8 +120,23 @@ class TelegramAuth:
             True если данные не истекли
         """
         try:
-            auth_timestamp = int(auth_date)
-            current_timestamp = int(datetime.now(timezone.utc).timestamp())
-            return (current_timestamp - auth_timestamp) <= max_age_seconds
+            return (time.time() - int(auth_date)) <= max_age_seconds
         except (ValueError, TypeError):
             return False
+
+    @staticmethod
+    def remaining_ttl(auth_date: str, max_age_seconds: int = 86400) -> int:
+        """
+        Сколько секунд осталось до истечения auth_date.
+
+        Args:
+            auth_date: Unix timestamp в виде строки
+            max_age_seconds: Максимальный возраст в секундах (по умолчанию 24 часа)
+
+        Returns:
+            Количество секунд (0 если данные истекли или невалидны)
+        """
+        try:
+            return max(0, int(auth_date) + max_age_seconds - int(time.time()))
+        except (ValueError, TypeError):
+            return 0
@@ -9,55 +9,100 @@
 
 import functools
 import inspect
-import json
 import logging
+import string
 from datetime import datetime
-from typing import Callable, Type
+from typing import Any, Callable, Type
+
+import msgpack
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import make_transient_to_detached
 
 logger = logging.getLogger(__name__)
 
+# Код msgpack ExtType для datetime (payload — isoformat в UTF-8)
+_EXT_DATETIME = 1
+
+
+def _encode_ext(obj):
+    """Кодирование типов, которых нет в msgpack."""
+    if isinstance(obj, datetime):
+        return msgpack.ExtType(_EXT_DATETIME, obj.isoformat().encode())
+    raise TypeError(f"Cannot serialize {type(obj).__name__}")
+
+
+def _decode_ext(code: int, data: bytes):
+    """Декодирование ExtType обратно в Python объекты."""
+    if code == _EXT_DATETIME:
+        return datetime.fromisoformat(data.decode())
+    return msgpack.ExtType(code, data)
+
 
-def _serialize(obj) -> str:
-    """Сериализация объекта в JSON."""
-    if obj is None:
-        return json.dumps(None)
+@functools.cache
+def _column_keys(model: Type) -> tuple[str, ...]:
+    """Атрибуты-колонки ORM модели в порядке маппера."""
+    return tuple(attr.key for attr in sa_inspect(model).column_attrs)
 
+
+def _serialize(obj) -> bytes:
+    """
+    Сериализация объекта в msgpack.
+
+    ORM объект хранится как массив значений колонок (без имён полей) —
+    порядок задаётся _column_keys модели.
+    """
     if hasattr(obj, "__table__"):  # SQLAlchemy model
-        data = {c.name: getattr(obj, c.name) for c in obj.__table__.columns}
-        # datetime -> isoformat
-        for k, v in data.items():
-            if isinstance(v, datetime):
-                data[k] = v.isoformat()
-        data["__model__"] = obj.__class__.__name__
-        return json.dumps(data)
+        obj = [getattr(obj, key) for key in _column_keys(type(obj))]
 
-    return json.dumps(obj)
+    return msgpack.packb(obj, default=_encode_ext, use_bin_type=True)
 
 
-def _deserialize(data: str, model: Type = None):
-    """Десериализация из JSON."""
-    obj = json.loads(data)
+def _deserialize(data: bytes, model: Type = None):
+    """Десериализация из msgpack."""
+    obj = msgpack.unpackb(data, ext_hook=_decode_ext, raw=False)
 
-    if obj is None:
-        return None
+    if model:
+        keys = _column_keys(model)
+        if not isinstance(obj, list) or len(obj) != len(keys):
+            # Запись другого формата или сделана до изменения схемы — считаем промахом
+            raise ValueError(f"Stale cache entry for {model.__name__}")
 
-    if model and isinstance(obj, dict) and "__model__" in obj:
-        obj.pop("__model__")
-        # datetime fields
-        for k, v in obj.items():
-            if isinstance(v, str) and "T" in v:
-                try:
-                    obj[k] = datetime.fromisoformat(v)
-                except ValueError:
-                    pass
-        instance = model.__new__(model)
-        for k, v in obj.items():
-            setattr(instance, k, v)
+        # Без __init__: instance state создаёт class manager, значения кладём напрямую.
+        # detached (с identity key), чтобы session.add() дал UPDATE, а не INSERT
+        instance = sa_inspect(model).class_manager.new_instance()
+        instance.__dict__.update(zip(keys, obj))
+        make_transient_to_detached(instance)
         return instance
 
     return obj
 
 
+def _compile_key(template: str) -> Callable[[dict], str]:
+    """
+    Компиляция шаблона ключа в функцию params -> str.
+
+    Шаблон разбирается один раз; для типичного "prefix:{field}" ключ
+    собирается простой конкатенацией.
+    """
+    parts = list(string.Formatter().parse(template))
+
+    # format spec, conversion, атрибуты/индексы — оставляем str.format_map
+    if any(
+        spec or conversion or (field is not None and not field.isidentifier())
+        for _, field, spec, conversion in parts
+    ):
+        return template.format_map
+
+    if len(parts) == 1 and parts[0][1] is not None:
+        prefix, field = parts[0][0], parts[0][1]
+        return lambda params: prefix + str(params[field])
+
+    return lambda params: "".join(
+        literal + (str(params[field]) if field is not None else "")
+        for literal, field, _, _ in parts
+    )
+
+
 def cached(ttl: int, key: str, model: Type = None):
     """
     Декоратор для кэширования.
@@ -71,25 +116,22 @@ def cached(ttl: int, key: str, model: Type = None):
     """
 
     def decorator(func: Callable):
-        @functools.wraps(func)
-        async def wrapper(*args, **kwargs):
-            # Получаем сигнатуру функции
-            sig = inspect.signature(func)
-            param_names = list(sig.parameters.keys())
+        # Сигнатура разбирается один раз при декорировании, а не на каждый вызов
+        param_names = list(inspect.signature(func).parameters)
 
-            # Пропускаем self/cls (первый параметр)
-            if param_names and param_names[0] in ("self", "cls"):
-                param_names = param_names[1:]
-                func_args = args[1:]  # пропускаем self/cls
-            else:
-                func_args = args
+        # Пропускаем self/cls (первый параметр)
+        skip = 1 if param_names and param_names[0] in ("self", "cls") else 0
+        param_names = param_names[skip:]
+        build_key = _compile_key(key)
 
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
             # Формируем словарь параметров
-            params = dict(zip(param_names, func_args))
+            params = dict(zip(param_names, args[skip:]))
             params.update(kwargs)
 
             # Формируем ключ кэша
-            cache_key = key.format(**params)
+            cache_key = build_key(params)
 
             # Пытаемся получить из кэша
             try:
@@ -128,3 +170,47 @@ async def invalidate(key: str) -> None:
         await redis_client.delete(key)
     except Exception:
         pass
+
+
+def _deserialize_or_none(data: bytes | None, model: Type = None):
+    """Десериализация значения из MGET; битая/устаревшая запись — промах."""
+    if not data:
+        return None
+    try:
+        return _deserialize(data, model)
+    except Exception:
+        return None
+
+
+async def get_many(keys: list[str], model: Type = None) -> list[Any | None]:
+    """
+    Прочитать несколько ключей кэша одним MGET.
+
+    Returns:
+        Значения в порядке keys (None — промах или Redis недоступен)
+    """
+    if not keys:
+        return []
+    try:
+        from common.redis import redis_client
+
+        values = await redis_client.mget(keys)
+    except Exception:
+        return [None] * len(keys)
+
+    return [_deserialize_or_none(value, model) for value in values]
+
+
+async def set_many(items: dict[str, Any], ttl: int) -> None:
+    """Сохранить несколько значений в кэш одним pipeline."""
+    if not items:
+        return
+    try:
+        from common.redis import redis_client
+
+        pipe = redis_client.pipeline()
+        for key, value in items.items():
+            pipe.set(key, _serialize(value), ex=ttl)
+        await pipe.execute()
+    except Exception:
+        pass
@@ -7,41 +7,74 @@
 """
 
 from contextlib import asynccontextmanager
+from functools import lru_cache
 from typing import AsyncGenerator
 
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
-from sqlalchemy.orm import declarative_base
+from sqlalchemy.orm import ORMExecuteState, Session, declarative_base
 
 from config import config
 
 Base = declarative_base()
 
-_engine: AsyncEngine | None = None
-_session_maker: async_sessionmaker[AsyncSession] | None = None
-
-
-def _init_db() -> None:
-    """Инициализация engine и session_maker."""
-    global _engine, _session_maker
-
-    if _engine is None:
-        _engine = create_async_engine(
-            config.database_url,
-            echo=False,
-            pool_size=10,
-            max_overflow=20,
-            pool_pre_ping=True,
-        )
-        _session_maker = async_sessionmaker(
-            _engine,
-            class_=AsyncSession,
-            expire_on_commit=False,
-        )
+# Флаг в session.info: в сессии были (или могли быть) записи и её нужно коммитить
+WRITES_KEY = "has_writes"
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_flush_writes(session: Session, flush_context) -> None:
+    session.info[WRITES_KEY] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_statement_writes(orm_execute_state: ORMExecuteState) -> None:
+    # Всё, что не select() (DML, text(), процедуры), считаем записью — лишний COMMIT
+    # дешевле потерянных данных
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info[WRITES_KEY] = True
+
+
+@lru_cache(maxsize=1)
+def _get_engine() -> AsyncEngine:
+    """Engine создаётся при первом обращении и переиспользуется."""
+    pg = config.postgres
+    connect_args = {
+        "server_settings": {"jit": "off"},
+        "command_timeout": pg.command_timeout,
+    }
+    if pg.pgbouncer:
+        # PgBouncer (transaction mode) не поддерживает prepared statements
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_cache_size"] = 0
+
+    return create_async_engine(
+        config.database_url,
+        echo=False,
+        pool_size=pg.pool_size,
+        max_overflow=pg.max_overflow,
+        pool_timeout=pg.pool_timeout,
+        pool_recycle=pg.pool_recycle,
+        pool_pre_ping=True,
+        # LRU кэш скомпилированных запросов (по умолчанию 500)
+        query_cache_size=1200,
+        connect_args=connect_args,
+    )
+
+
+@lru_cache(maxsize=1)
+def _get_session_maker() -> async_sessionmaker[AsyncSession]:
+    """Фабрика сессий поверх общего engine."""
+    return async_sessionmaker(
+        _get_engine(),
+        class_=AsyncSession,
+        expire_on_commit=False,
+    )
 
 
 @asynccontextmanager
@@ -55,13 +88,15 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
             user = await repo.get_by_id(1)
 
     Автоматически коммитит при успехе, откатывает при ошибке.
+    Если в сессии выполнялись только select(), COMMIT не отправляется:
+    транзакция закрывается rollback'ом при возврате соединения в пул.
+    Любой другой запрос (включая text()) помечает сессию как пишущую.
     """
-    _init_db()
-
-    async with _session_maker() as session:
+    async with _get_session_maker()() as session:
         try:
             yield session
-            await session.commit()
+            if session.info.get(WRITES_KEY) or session.new or session.dirty or session.deleted:
+                await session.commit()
         except Exception:
             await session.rollback()
             raise
@@ -69,9 +104,7 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
 
 async def close_db() -> None:
     """Закрыть соединения с БД."""
-    global _engine, _session_maker
-
-    if _engine is not None:
-        await _engine.dispose()
-        _engine = None
-        _session_maker = None
+    if _get_engine.cache_info().currsize:
+        await _get_engine().dispose()
+    _get_session_maker.cache_clear()
+    _get_engine.cache_clear()
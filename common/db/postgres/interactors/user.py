@@ -2,11 +2,31 @@
 Репозиторий для работы с пользователями.
 """
 
-from sqlalchemy import select
+from sqlalchemy import bindparam, case, func, insert, literal_column, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import QueryableAttribute, raiseload, selectinload
 
-from common.cache import cached, invalidate
+from common.cache import cached, get_many, invalidate, set_many
 from common.db.postgres.models.user import User
+from config import config
+
+# В debug режиме ленивая загрузка связей запрещена: N+1 сразу падает с ошибкой.
+# Нужные связи подгружай явно через selectinload(...)
+_LOADER_OPTIONS = (raiseload("*"),) if config.api.debug else ()
+
+# Поля, которые можно менять через update(); id и временные метки ставит БД
+_USER_WRITABLE = frozenset(c.name for c in User.__table__.columns) - {"id", "created_at", "updated_at"}
+
+# Запрос строится один раз при импорте, на вызове только подставляется параметр
+_STMT_GET_BY_TG = (
+    select(User).where(User.telegram_id == bindparam("tid")).limit(1).options(*_LOADER_OPTIONS)
+)
+
+
+# Advisory lock на telegram_id до конца транзакции: конкурентные get_or_create
+# одного пользователя выполняются по очереди, разные пользователи не блокируются
+_STMT_LOCK_TG = select(func.pg_advisory_xact_lock(func.hashtextextended(bindparam("key"), 0)))
 
 
 class UserRepository:
@@ -24,17 +44,72 @@ class UserRepository:
 
     @cached(ttl=300, key="user:{user_id}", model=User)
     async def get_by_id(self, user_id: int) -> User | None:
-        """Получить пользователя по ID."""
-        result = await self.session.execute(select(User).where(User.id == user_id))
-        return result.scalar_one_or_none()
+        """Получить пользователя по ID (через identity map сессии)."""
+        return await self.session.get(User, user_id, options=_LOADER_OPTIONS)
 
     @cached(ttl=300, key="user:tg:{telegram_id}", model=User)
     async def get_by_telegram_id(self, telegram_id: int) -> User | None:
         """Получить пользователя по telegram_id."""
-        result = await self.session.execute(
-            select(User).where(User.telegram_id == telegram_id)
+        return await self.session.scalar(_STMT_GET_BY_TG, {"tid": telegram_id})
+
+    async def get_with_related(self, user_id: int, *relationships: QueryableAttribute) -> User | None:
+        """
+        Получить пользователя вместе с указанными связями.
+
+        Каждая связь грузится отдельным selectinload (один SELECT ... IN на связь),
+        остальные закрыты raiseload — случайное обращение к ним падает, а не
+        порождает N+1.
+
+        Пример:
+            user = await repo.get_with_related(user_id, User.orders, User.payments)
+        """
+        return await self.session.scalar(
+            select(User)
+            .where(User.id == user_id)
+            .options(*(selectinload(rel) for rel in relationships), raiseload("*"))
+        )
+
+    async def get_many_by_telegram_ids(self, telegram_ids: list[int]) -> list[User | None]:
+        """
+        Получить пользователей по списку telegram_id.
+
+        Кэш читается одним MGET, промахи добираются одним SELECT ... IN
+        и кладутся в кэш одним pipeline — 2 round-trip вместо 2N.
+
+        Returns:
+            Пользователи в порядке telegram_ids (None — не найден)
+        """
+        keys = [f"user:tg:{telegram_id}" for telegram_id in telegram_ids]
+        found = {
+            telegram_id: user
+            for telegram_id, user in zip(telegram_ids, await get_many(keys, model=User))
+            if user is not None
+        }
+
+        missing = {telegram_id for telegram_id in telegram_ids if telegram_id not in found}
+        if missing:
+            fetched = await self.session.scalars(
+                select(User).where(User.telegram_id.in_(missing)).options(*_LOADER_OPTIONS)
+            )
+            fetched_by_tg = {user.telegram_id: user for user in fetched}
+            found.update(fetched_by_tg)
+            await set_many({f"user:tg:{tg_id}": user for tg_id, user in fetched_by_tg.items()}, ttl=300)
+
+        return [found.get(telegram_id) for telegram_id in telegram_ids]
+
+    @staticmethod
+    def profile_changed(
+        user: User,
+        username: str | None = None,
+        first_name: str | None = None,
+        last_name: str | None = None,
+    ) -> bool:
+        """Изменились ли данные профиля (None = данных нет, не сравниваем)."""
+        return (
+            (username is not None and user.username != username)
+            or (first_name is not None and user.first_name != first_name)
+            or (last_name is not None and user.last_name != last_name)
         )
-        return result.scalar_one_or_none()
 
     async def _invalidate_user(self, user: User) -> None:
         """Инвалидировать все кэши пользователя."""
@@ -48,17 +123,18 @@ class UserRepository:
         first_name: str | None = None,
         last_name: str | None = None,
     ) -> User:
-        """Создать нового пользователя."""
-        user = User(
-            telegram_id=telegram_id,
-            username=username,
-            first_name=first_name,
-            last_name=last_name,
+        """Создать нового пользователя (INSERT ... RETURNING, без отдельного refresh)."""
+        result = await self.session.execute(
+            insert(User)
+            .values(
+                telegram_id=telegram_id,
+                username=username,
+                first_name=first_name,
+                last_name=last_name,
+            )
+            .returning(User)
         )
-        self.session.add(user)
-        await self.session.flush()
-        await self.session.refresh(user)
-        return user
+        return result.scalar_one()
 
     async def get_or_create(
         self,
@@ -70,64 +146,62 @@ class UserRepository:
         """
         Получить или создать пользователя.
 
-        Обновляет данные если они изменились.
+        Один запрос INSERT ... ON CONFLICT (telegram_id) DO UPDATE ... RETURNING:
+        атомарно и без гонки между SELECT и INSERT. Обновляются только
+        переданные (не None) поля, updated_at — только если они изменились.
+
+        Перед upsert берётся advisory lock на telegram_id, чтобы параллельные
+        вставки одного пользователя не порождали лишние конфликты
+        (ON CONFLICT остаётся страховкой).
 
         Returns:
             tuple[User, bool]: (пользователь, создан ли новый)
         """
-        user = await self.get_by_telegram_id(telegram_id)
+        await self.session.execute(_STMT_LOCK_TG, {"key": f"user:{telegram_id}"})
 
-        if user:
-            needs_update = False
-
-            if username is not None and user.username != username:
-                needs_update = True
-            if first_name is not None and user.first_name != first_name:
-                needs_update = True
-            if last_name is not None and user.last_name != last_name:
-                needs_update = True
-
-            if needs_update:
-                # Получаем свежий объект из БД для обновления
-                result = await self.session.execute(
-                    select(User).where(User.id == user.id)
-                )
-                db_user = result.scalar_one()
-                db_user.username = username
-                db_user.first_name = first_name
-                db_user.last_name = last_name
-                await self.session.flush()
-                await self.session.refresh(db_user)
-                await self._invalidate_user(db_user)
-                return db_user, False
-
-            return user, False
-
-        # Создаём нового
-        user = User(
+        stmt = pg_insert(User).values(
             telegram_id=telegram_id,
             username=username,
             first_name=first_name,
             last_name=last_name,
         )
-        self.session.add(user)
-        await self.session.flush()
-        await self.session.refresh(user)
-        return user, True
+        profile = {"username": username, "first_name": first_name, "last_name": last_name}
+        update_cols = {key: stmt.excluded[key] for key, value in profile.items() if value is not None}
+
+        if update_cols:
+            changed = or_(*(User.__table__.c[key].is_distinct_from(col) for key, col in update_cols.items()))
+            update_cols["updated_at"] = case((changed, stmt.excluded.updated_at), else_=User.updated_at)
+        else:
+            # DO NOTHING не возвращает строку — делаем пустой апдейт ради RETURNING
+            update_cols["telegram_id"] = stmt.excluded.telegram_id
+
+        stmt = (
+            stmt.on_conflict_do_update(index_elements=[User.telegram_id], set_=update_cols)
+            # xmax = 0 только у только что вставленной строки
+            .returning(User, literal_column("xmax = 0").label("inserted"))
+            .execution_options(populate_existing=True)
+        )
+        user, created = (await self.session.execute(stmt)).one()
 
-    async def update(self, user_id: int, **kwargs) -> User | None:
-        """Обновить данные пользователя."""
-        result = await self.session.execute(select(User).where(User.id == user_id))
-        user = result.scalar_one_or_none()
+        if not created:
+            await self._invalidate_user(user)
+        return user, created
 
-        if not user:
-            return None
+    async def update(self, user_id: int, **kwargs) -> User | None:
+        """Обновить данные пользователя (UPDATE ... RETURNING, один запрос)."""
+        values = {key: value for key, value in kwargs.items() if key in _USER_WRITABLE}
+        if not values:
+            return await self.get_by_id(user_id)
 
-        for key, value in kwargs.items():
-            if hasattr(user, key):
-                setattr(user, key, value)
+        result = await self.session.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(**values)
+            .returning(User)
+            .execution_options(populate_existing=True)
+        )
+        user = result.scalar_one_or_none()
 
-        await self.session.flush()
-        await self.session.refresh(user)
-        await self._invalidate_user(user)
+        if user:
+            await self._invalidate_user(user)
         return user
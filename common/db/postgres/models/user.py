@@ -5,7 +5,7 @@
 """
 from datetime import datetime
 
-from sqlalchemy import String, DateTime, BigInteger
+from sqlalchemy import String, DateTime, BigInteger, Index, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from common.db.postgres.base import Base
@@ -15,22 +15,36 @@ class User(Base):
     """Модель пользователя Telegram"""
 
     __tablename__ = "users"
+    __table_args__ = (
+        # Покрывающий уникальный индекс: поиск по telegram_id — index-only scan,
+        # поэтому INCLUDE содержит все колонки, которые возвращает select(User)
+        Index(
+            "ix_users_tg_cover",
+            "telegram_id",
+            unique=True,
+            postgresql_include=["id", "username", "first_name", "last_name", "created_at", "updated_at"],
+        ),
+    )
 
     # Первичный ключ
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
 
     # Данные пользователя
-    telegram_id: Mapped[int] = mapped_column(BigInteger, unique=True, nullable=False, index=True)
+    telegram_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
     username: Mapped[str | None] = mapped_column(String(255), nullable=True)
     first_name: Mapped[str | None] = mapped_column(String(255), nullable=True)
     last_name: Mapped[str | None] = mapped_column(String(255), nullable=True)
 
-    # Временные метки
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    # Временные метки (ставит БД: NOW() в INSERT/UPDATE, значения приходят через RETURNING)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
     updated_at: Mapped[datetime] = mapped_column(
-        DateTime,
-        default=datetime.utcnow,
-        onupdate=datetime.utcnow,
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
         nullable=False
     )
 
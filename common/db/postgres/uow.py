@@ -13,6 +13,8 @@ Unit of Work — единая точка доступа ко всем репоз
         user = await uow.users.get_by_id(1)
 """
 
+from functools import cached_property
+
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from common.db.postgres.interactors.user import UserRepository
@@ -23,12 +25,17 @@ class UnitOfWork:
     Unit of Work — контейнер для всех репозиториев.
 
     Все репозитории используют одну сессию = одну транзакцию.
+    Репозиторий создаётся при первом обращении (cached_property).
     """
 
     def __init__(self, session: AsyncSession):
         self.session = session
-        self.users = UserRepository(session)
-        # Добавляй новые репозитории сюда:
-        # self.orders = OrderRepository(session)
-        # self.payments = PaymentRepository(session)
-        # self.logs = LogRepository(session)
+
+    @cached_property
+    def users(self) -> UserRepository:
+        return UserRepository(self.session)
+
+    # Добавляй новые репозитории сюда:
+    # @cached_property
+    # def orders(self) -> OrderRepository:
+    #     return OrderRepository(self.session)
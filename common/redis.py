@@ -11,17 +11,22 @@ Redis клиент с connection pooling.
 
     # В коде
     await redis_client.set("key", "value", ex=3600)
-    value = await redis_client.get("key")
+    value = await redis_client.get("key")  # bytes
 """
 
-import json
 from typing import Any
 
+import orjson
 from redis.asyncio import Redis, ConnectionPool
+from redis.asyncio.client import Pipeline
 
 from config import config
 
 
+# Методы, которые после connect() указывают прямо на методы Redis клиента
+_SHORTCUTS = ("get", "set", "delete", "mget")
+
+
 class RedisClient:
     """Async Redis клиент с connection pooling."""
 
@@ -30,15 +35,22 @@ class RedisClient:
         self._client: Redis | None = None
 
     async def connect(self) -> None:
-        """Подключение к Redis."""
+        """Подключение к Redis (повторный вызов переиспользует существующий пул)."""
+        if self._client is not None:
+            return
+
+        # decode_responses не включаем: значения отдаются как bytes без декодирования
         self._pool = ConnectionPool.from_url(
             config.redis.url,
-            max_connections=10,
-            decode_responses=True,
+            max_connections=config.redis.max_connections,
+            health_check_interval=30,
+            socket_keepalive=True,
+            retry_on_timeout=True,
         )
         self._client = Redis(connection_pool=self._pool)
         # Проверяем подключение
         await self._client.ping()
+        self._bind_shortcuts()
         print(f"Redis connected: {config.redis.host}:{config.redis.port}")
 
     async def disconnect(self) -> None:
@@ -47,8 +59,26 @@ class RedisClient:
             await self._client.aclose()
         if self._pool:
             await self._pool.disconnect()
+        self._client = None
+        self._pool = None
+        self._unbind_shortcuts()
         print("Redis disconnected")
 
+    def _bind_shortcuts(self) -> None:
+        """
+        Привязать горячие shortcut методы напрямую к методам Redis клиента.
+
+        После connect() redis_client.get(...) — это вызов Redis.get без
+        промежуточной обёртки и проверки свойства client.
+        """
+        for name in _SHORTCUTS:
+            setattr(self, name, getattr(self._client, name))
+
+    def _unbind_shortcuts(self) -> None:
+        """Вернуть shortcut методы класса (они бросают ошибку без подключения)."""
+        for name in _SHORTCUTS:
+            self.__dict__.pop(name, None)
+
     @property
     def client(self) -> Redis:
         """Получить Redis клиент."""
@@ -56,26 +86,57 @@ class RedisClient:
             raise RuntimeError("Redis not connected. Call connect() first.")
         return self._client
 
-    # Shortcut методы
-    async def get(self, key: str) -> str | None:
+    # Shortcut методы (после connect() заменяются методами Redis клиента)
+    async def get(self, key: str) -> bytes | None:
         return await self.client.get(key)
 
-    async def set(self, key: str, value: str, ex: int | None = None) -> None:
+    async def set(self, key: str, value: str | bytes, ex: int | None = None) -> None:
         await self.client.set(key, value, ex=ex)
 
     async def delete(self, key: str) -> None:
         await self.client.delete(key)
 
+    async def mget(self, keys: list[str]) -> list[bytes | None]:
+        return await self.client.mget(keys)
+
     async def get_json(self, key: str) -> Any | None:
         """Получить JSON значение."""
         value = await self.get(key)
         if value:
-            return json.loads(value)
+            return orjson.loads(value)
         return None
 
     async def set_json(self, key: str, value: Any, ex: int | None = None) -> None:
         """Сохранить JSON значение."""
-        await self.set(key, json.dumps(value), ex=ex)
+        await self.set(key, orjson.dumps(value), ex=ex)
+
+    async def mget_json(self, keys: list[str]) -> list[Any | None]:
+        """Получить несколько JSON значений одним MGET."""
+        if not keys:
+            return []
+        values = await self.mget(keys)
+        return [orjson.loads(value) if value else None for value in values]
+
+    async def mset_json(self, items: dict[str, Any], ex: int | None = None) -> None:
+        """Сохранить несколько JSON значений за один round-trip."""
+        if not items:
+            return
+        pipe = self.pipeline()
+        for key, value in items.items():
+            pipe.set(key, orjson.dumps(value), ex=ex)
+        await pipe.execute()
+
+    def pipeline(self) -> Pipeline:
+        """
+        Pipeline без транзакции для пакетных операций.
+
+        Использование:
+            pipe = redis_client.pipeline()
+            pipe.set("a", "1", ex=60)
+            pipe.set("b", "2", ex=60)
+            await pipe.execute()
+        """
+        return self.client.pipeline(transaction=False)
 
     async def ping(self) -> bool:
         """Проверка подключения к Redis."""
@@ -1,3 +1,5 @@
+from functools import cached_property, lru_cache
+
 from pydantic import BaseModel, Field, computed_field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -11,13 +13,22 @@ class DatabaseConfig(BaseModel):
     port: int = Field(default=5432, description="PostgreSQL port")
     db: str = Field(..., description="PostgreSQL database name")
 
+    # Пул соединений. Ориентир: pool_size ≈ количество воркеров * 2,
+    # суммарно (pool_size + max_overflow) * воркеры < max_connections в PostgreSQL
+    pool_size: int = Field(default=20, description="Постоянных соединений в пуле")
+    max_overflow: int = Field(default=30, description="Дополнительных соединений сверх pool_size")
+    pool_timeout: int = Field(default=10, description="Ожидание свободного соединения (секунды)")
+    pool_recycle: int = Field(default=1800, description="Пересоздавать соединения старше N секунд")
+    command_timeout: int = Field(default=30, description="Таймаут запроса asyncpg (секунды)")
+    pgbouncer: bool = Field(default=False, description="Отключить кэш prepared statements (за PgBouncer)")
+
     @computed_field
-    @property
+    @cached_property
     def url(self) -> str:
-        """Генерирует database URL для SQLAlchemy"""
+        """Генерирует database URL для SQLAlchemy (вычисляется один раз)"""
         return (
             f"postgresql+asyncpg://{self.user}:{self.password}@"
-            f"{self.host}:{self.port}/{self.db}?async_fallback=True"
+            f"{self.host}:{self.port}/{self.db}"
         )
 
 
@@ -33,6 +44,10 @@ class ApiConfig(BaseModel):
     debug: bool = Field(default=False, description="Debug mode")
     debug_token: str | None = Field(default=None, description="Debug token for development")
     docs_secret: str | None = Field(default=None, description="Secret path for API docs (None = public)")
+    allowed_origins: list[str] = Field(
+        default=["*"],
+        description='CORS origins, например ["https://my-app.example.com"] (["*"] = любые)',
+    )
 
 
 class RedisConfig(BaseModel):
@@ -41,11 +56,12 @@ class RedisConfig(BaseModel):
     host: str = Field(default="localhost", description="Redis host")
     port: int = Field(default=6379, description="Redis port")
     db: int = Field(default=0, description="Redis database number")
+    max_connections: int = Field(default=50, description="Размер пула соединений Redis")
 
     @computed_field
-    @property
+    @cached_property
     def url(self) -> str:
-        """Redis URL для подключения"""
+        """Redis URL для подключения (вычисляется один раз)"""
         return f"redis://{self.host}:{self.port}/{self.db}"
 
 
@@ -76,5 +92,11 @@ class Config(BaseSettings):
         return self.postgres.url
 
 
+@lru_cache(maxsize=1)
+def get_config() -> Config:
+    """Синглтон конфига: .env и переменные окружения читаются один раз."""
+    return Config()
+
+
 # Создаём синглтон конфига
-config = Config()
+config = get_config()
@@ -0,0 +1,37 @@
+"""
+Общие фикстуры тестов.
+"""
+
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+@contextmanager
+def _count_queries(engine: AsyncEngine):
+    """
+    Собирает SQL, отправленный через engine (before_cursor_execute).
+
+    Использование:
+        with count_queries(engine) as queries:
+            await repo.get_by_id(1)
+        assert len(queries) <= 1
+    """
+    queries: list[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        queries.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield queries
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.fixture
+def count_queries():
+    """Context manager для подсчёта SQL запросов (защита от N+1)."""
+    return _count_queries
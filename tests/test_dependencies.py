@@ -0,0 +1,78 @@
+"""
+Тесты API dependencies: один UnitOfWork на запрос.
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import Depends
+from fastapi.testclient import TestClient
+
+import api.dependencies as deps
+from api.main import app
+from common.db.postgres.models.user import User
+
+
+class FakeSession:
+    """Заглушка AsyncSession: отдаёт одного пользователя, БД не нужна."""
+
+    async def get(self, model, ident, options=None):
+        now = datetime.now(timezone.utc)
+        return User(id=ident, telegram_id=777, username="u", created_at=now, updated_at=now)
+
+
+@pytest.fixture
+def client():
+    """TestClient без lifespan (Redis не подключается) с подменённой сессией."""
+    created = []
+
+    async def fake_db_session():
+        yield FakeSession()
+
+    async def recording_get_uow(session=Depends(deps.get_db_session)):
+        uow = await deps.get_uow(session)
+        created.append(uow)
+        return uow
+
+    app.dependency_overrides[deps.get_db_session] = fake_db_session
+    app.dependency_overrides[deps.get_uow] = recording_get_uow
+    yield TestClient(app), created
+    app.dependency_overrides.clear()
+
+
+def test_current_user_and_endpoint_share_uow(client, monkeypatch):
+    """get_current_user и get_me получают один и тот же UnitOfWork."""
+    test_client, created = client
+    seen_by_auth = []
+
+    async def fake_verify(token, uow):
+        seen_by_auth.append(uow)
+        return 1
+
+    monkeypatch.setattr(deps, "_verify_and_resolve", fake_verify)
+
+    response = test_client.get("/users/me", headers={"Authorization": "Bearer init-data"})
+
+    assert response.status_code == 200
+    assert response.json()["id"] == 1
+    # get_uow вызван один раз за запрос, и именно этот экземпляр получила аутентификация
+    assert len(created) == 1
+    assert id(seen_by_auth[0]) == id(created[0])
+    # эндпоинт обратился к репозиторию того же UnitOfWork
+    assert "users" in vars(created[0])
+
+
+def test_each_request_gets_own_uow(client, monkeypatch):
+    """Кэш зависимостей действует в рамках запроса, а не между запросами."""
+    test_client, created = client
+
+    async def fake_verify(token, uow):
+        return 1
+
+    monkeypatch.setattr(deps, "_verify_and_resolve", fake_verify)
+
+    for _ in range(2):
+        assert test_client.get("/users/me", headers={"Authorization": "Bearer init-data"}).status_code == 200
+
+    assert len(created) == 2
+    assert created[0] is not created[1]
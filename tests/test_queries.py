@@ -0,0 +1,81 @@
+"""
+Количество SQL запросов в UserRepository (защита от N+1).
+
+Нужен живой PostgreSQL из POSTGRES__* — без него тесты пропускаются.
+Всё выполняется в одной транзакции, которая откатывается: данные в БД не меняются.
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from common.db.postgres.base import Base
+from common.db.postgres.interactors.user import UserRepository
+from config import config
+
+# telegram_id, которых точно нет в рабочих данных
+TG_BASE = 9_000_000_000_000
+
+
+def run_in_rollback(scenario):
+    """Запустить scenario(repo, engine) в транзакции с откатом на отдельном engine."""
+
+    async def runner():
+        engine = create_async_engine(config.postgres.url, poolclass=NullPool)
+        try:
+            try:
+                conn = await engine.connect()
+            except Exception as e:  # нет сервера, неверные POSTGRES__*, ...
+                pytest.skip(f"PostgreSQL недоступен: {e}")
+
+            try:
+                trans = await conn.begin()
+                await conn.run_sync(Base.metadata.create_all)
+                async with AsyncSession(bind=conn, expire_on_commit=False) as session:
+                    await scenario(UserRepository(session), engine)
+                await trans.rollback()
+            finally:
+                await conn.close()
+        finally:
+            await engine.dispose()
+
+    asyncio.run(runner())
+
+
+def test_get_by_id_single_query(count_queries):
+    async def scenario(repo, engine):
+        user = await repo.create(TG_BASE + 1, username="a")
+        repo.session.expunge_all()
+
+        with count_queries(engine) as queries:
+            assert (await repo.get_by_id(user.id)).username == "a"
+        assert len(queries) == 1
+
+    run_in_rollback(scenario)
+
+
+def test_get_or_create_lock_and_upsert(count_queries):
+    async def scenario(repo, engine):
+        with count_queries(engine) as queries:
+            _, created = await repo.get_or_create(TG_BASE + 2, username="b")
+        assert created
+        # advisory lock + INSERT ... ON CONFLICT ... RETURNING
+        assert len(queries) == 2
+
+    run_in_rollback(scenario)
+
+
+def test_get_many_by_telegram_ids_single_select(count_queries):
+    async def scenario(repo, engine):
+        ids = [TG_BASE + 10 + i for i in range(5)]
+        for telegram_id in ids:
+            await repo.create(telegram_id)
+
+        with count_queries(engine) as queries:
+            users = await repo.get_many_by_telegram_ids(ids)
+        assert [user.telegram_id for user in users] == ids
+        assert len(queries) == 1
+
+    run_in_rollback(scenario)